@@ -1,21 +1,33 @@
 from __future__ import annotations
 
-import json
+import atexit
+import orjson
+import re
 import sys
-import wx
+import threading
+import time
 import typing
 
+from datetime import date
 from ramda_py.decor import *
 from ramda_py.util import *
 from typing import TYPE_CHECKING
 
 
 if TYPE_CHECKING:
-    from datetime import date
     from ramda_py.types import *
 
+
+def json_dumps(obj: object, *, indent: bool = False) -> bytes:
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+
+
+json_loads = orjson.loads
+
 DATA_DIR = rootpath(__file__, "data", mkdir=True, resolve=True).as_posix()
 
+BOOLSTRINGS = typing.final({"True": True, "False": False})
+
 
 class argtype:
     @staticmethod
@@ -28,14 +40,14 @@ class argtype:
 
         try:
             return date.fromisoformat(value)
-        except Exception:
+        except (TypeError, ValueError):
             raise TypeError("Date must be in ISO format.")
 
     @staticmethod
     def boolstring(value) -> bool:
-        if isinstance(value, str):
-            return str(value) == "True"
-        raise TypeError("Must be either 'True' or 'False'.")
+        if (result := BOOLSTRINGS.get(value)) is None:
+            raise TypeError("Must be either 'True' or 'False'.")
+        return result
 
     @staticmethod
     def nowhitespaces(value) -> str:
@@ -43,26 +55,81 @@ class argtype:
             return value.strip()
         raise TypeError("Must be a string not containing any whitespaces.")
 
+    @staticmethod
+    def nonnegative(value) -> int:
+        try:
+            result = int(value)
+        except (TypeError, ValueError):
+            raise TypeError("Must be an integer.")
+        if result < 0:
+            raise TypeError("Must not be negative.")
+        return result
+
     @staticmethod
     def integerlist(value) -> list[int]:
+        text = value if isinstance(value, str) else str(value)
         try:
-            return [int(n.strip()) for n in str(value).split(",")]
-        except Exception:
+            return list(map(int, text.split(",")))
+        except ValueError:
             raise TypeError("All values in the list must be integers.")
 
 
 class console:
     NEWLINE = typing.final(chr(13) + chr(10) if sys.platform == "win32" else chr(10))
     FILE = typing.final(rootpath(__file__, "logs", mkdir=True) / "latest-execution.log")
-    WHITELIST = typing.final(["progress"])
-    BLACKLIST = typing.final([
+    WHITELIST: typing.ClassVar[frozenset[str]] = frozenset({"progress"})
+    BLACKLIST: typing.ClassVar[frozenset[str]] = frozenset({
         "mupdf error",
         "image too small",
         "line cannot be recognized",
         "configuration",
         "file_info",
         "locals dumped",
-    ])
+    })
+    WHITELIST_RE = typing.final(re.compile("|".join(map(re.escape, sorted(WHITELIST))), re.IGNORECASE))
+    BLACKLIST_RE = typing.final(re.compile("|".join(map(re.escape, sorted(BLACKLIST))), re.IGNORECASE))
+    FLUSH_THRESHOLD = typing.final(1 << 16)
+    FLUSH_INTERVAL = typing.final(0.5)
+
+    _buffer: typing.ClassVar[bytearray] = bytearray()
+    _lock: typing.ClassVar[threading.RLock] = threading.RLock()
+    _timer: typing.ClassVar[threading.Timer | None] = None
+    _fp: typing.ClassVar[typing.BinaryIO | None] = None
+    _app: typing.ClassVar[wx.App | None] = None
+
+    @classmethod
+    def _write(cls, *lines: str) -> None:
+        data = (cls.NEWLINE.join(lines) + cls.NEWLINE).encode("utf-8")
+        with cls._lock:
+            cls._buffer.extend(data)
+            if len(cls._buffer) >= cls.FLUSH_THRESHOLD:
+                cls.flush()
+            elif cls._timer is None:
+                cls._timer = threading.Timer(cls.FLUSH_INTERVAL, cls.flush)
+                cls._timer.daemon = True
+                cls._timer.start()
+
+    @classmethod
+    def flush(cls) -> None:
+        with cls._lock:
+            if cls._timer is not None:
+                cls._timer.cancel()
+                cls._timer = None
+            if not cls._buffer:
+                return
+            if cls._fp is None:
+                cls._fp = cls.FILE.open("ab", buffering=0)
+            cls._fp.write(cls._buffer)
+            cls._buffer.clear()
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls._buffer.clear()
+            if cls._fp is None:
+                cls.FILE.write_bytes(b"")
+            else:
+                cls._fp.truncate(0)
 
     @classmethod
     def debug(cls, **kwds: object) -> None:
@@ -74,22 +141,19 @@ class console:
         cls,
         key: str | None = None,
         obj: JSONDict | None = None,
-        *,
-        indent: int = 4,
         **kwds: JSONSerializable,
     ) -> None:
         obj = {**(obj or {}), **kwds}
         data: JSONDict = obj if not key else {key: obj}
-        cls.log(json.dumps(obj=data, indent=indent))
+        cls.log(json_dumps(data, indent=True).decode())
 
     @classmethod
     def log(cls, *lines: object) -> None:
-        text = " ".join(str(line).lower() for line in lines)
-        if all(item not in text for item in cls.WHITELIST) or any(item in text for item in cls.BLACKLIST):
-            with cls.FILE.open("a+t", encoding="utf-8") as f:
-                print(*lines, sep=cls.NEWLINE, file=f)
+        texts = [line if type(line) is str else str(line) for line in lines]
+        if any(map(cls.BLACKLIST_RE.search, texts)) or not any(map(cls.WHITELIST_RE.search, texts)):
+            cls._write(*texts)
         else:
-            print(*lines, sep=cls.NEWLINE, file=sys.stdout, flush=True)
+            print(*texts, sep=cls.NEWLINE, file=sys.stdout, flush=True)
 
     @staticmethod
     def error(
@@ -101,8 +165,14 @@ class console:
         lines and console.log(lines)
         fatal and sys.exit(1)
 
-    @staticmethod
-    def confirm(prompt: str) -> bool:
+    @classmethod
+    def confirm(cls, prompt: str) -> bool:
+        import wx
+
+        # dialogs need an app, but only the process that actually asks should pay for one.
+        # it is kept for the life of the process since wx can't reliably build a second
+        if cls._app is None:
+            cls._app = wx.GetApp() or wx.App()
         dialogue = wx.MessageDialog(
             parent=None,
             message=prompt,
@@ -114,8 +184,12 @@ class console:
         return choice == wx.ID_YES
 
 
+atexit.register(console.flush)
+
+
 class track[I]:
     GLOBAL_TOTAL: typing.ClassVar[int] = 100
+    EMIT_INTERVAL: typing.ClassVar[float] = 0.1
 
     _total: int
 
@@ -131,14 +205,35 @@ class track[I]:
     description: str
     current: int = 0
 
+    _weights: Iterator[int] | None = None
+    _stride: int
+    _next_emit: int
+    _last_emit: float = 0.0
+
     @property
     def progress(self) -> str:
         return f"progress: {self.current}/{self.total}\n"
 
-    def __init__(self, iterable: Iter[I], desc: str, total: int | None = None) -> None:
-        self.total = total if not isinstance(iterable, typing.Sized) else len(iterable)
+    def __init__(
+        self,
+        iterable: Iter[I],
+        desc: str,
+        total: int | None = None,
+        *,
+        weight: Callable[[I], int] | None = None,
+    ) -> None:
+        if weight is not None:
+            iterable = list(iterable)
+            # weigh each item once, so the advances always add up to the total
+            weights = list(map(weight, iterable))
+            total = sum(weights)
+            self._weights = iter(weights)
+        elif isinstance(iterable, typing.Sized):
+            total = len(iterable)
+        self.total = total
         self.description = desc
         self.iterator = iter(iterable)
+        self._stride = self._next_emit = max(1, self.total // 100)
 
     def _write_progress(
         self,
@@ -153,14 +248,25 @@ class track[I]:
             self.total += 1
         elif advance:
             self.current += advance
-        console.log(self.progress)
+
+        now = time.monotonic()
+        if (
+            complete
+            or self.current >= self.total
+            or self.current >= self._next_emit
+            or now - self._last_emit >= self.EMIT_INTERVAL
+        ):
+            self._last_emit = now
+            self._next_emit = self.current + self._stride
+            console.log(self.progress)
 
     def __iter__(self) -> Generator[I]:
         console.log(self.description)
         try:
             while True:
-                yield next(self.iterator)
-                self._write_progress(advance=1)
+                item = next(self.iterator)
+                yield item
+                self._write_progress(advance=next(self._weights) if self._weights else 1)
         except StopIteration:
             self._write_progress(complete=True)
             del self.iterator, self.current, self._total, self.description
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import datetime as dt
+import functools
 import math
-import json
-import ollama
+import orjson
+import time
 import typing
 
 if typing.TYPE_CHECKING:
+    import ollama
     from .typeshed import *
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from apps.common import console, argtype, retry, timings, track, DATA_DIR
+from apps.common import console, argtype, retry, timings, track, json_dumps, json_loads, DATA_DIR
 
 from .extract import Extractor
 
@@ -39,6 +42,8 @@ Medical Record Text:
 {plaintext}
 """)
 
+PROMPT_HEAD, PROMPT_TAIL = PROMPT_TEMPLATE.split("{plaintext}")
+
 
 RESPONSE_SCHEMA = typing.final({
     "type": "object",
@@ -62,7 +67,16 @@ PROMPT_LENGTH = typing.final(
     len(SYSTEM_PROMPT) + len(PROMPT_TEMPLATE.format(desc="", date="", plaintext=""))
 )
 
-TODAY = dt.datetime.now().date().isoformat()
+TODAY = dt.date.today().isoformat()
+
+MODEL_CACHE_TTL = typing.final(30)
+
+
+@functools.lru_cache(maxsize=1)
+def _local_models(bucket: int) -> frozenset[str]:
+    import ollama
+
+    return frozenset(m.model for m in ollama.list().models if m.model)
 
 
 class Analyzer(Extractor):
@@ -71,8 +85,10 @@ class Analyzer(Extractor):
 
     model_id: str = "gemma3n:e4b"
 
-    @property
+    @functools.cached_property
     def _options(self) -> ollama.Options:
+        import ollama
+
         return ollama.Options(
             temperature=self.temperature,
             num_ctx=self.max_tokens,
@@ -88,13 +104,14 @@ class Analyzer(Extractor):
 
     @retry(max_retries=3)
     def _pull_model(self) -> None:
-        models = {m.model for m in ollama.list().models}
-        if self.model_id not in models:
+        if self.model_id not in _local_models(int(time.time()) // MODEL_CACHE_TTL):
+            import ollama
+
             ollama.pull(self.model_id)
 
     @property
     def config(self) -> JSONDict:
-        input_files: JSONList = [f.name for f in self.path.iterdir() if f.suffix == ".pdf"]
+        input_files: JSONList = [f.name for f in self._list_files(self.path, ".pdf")]
         return {
             "model_id": self.model_id,
             "input_files": input_files,
@@ -105,6 +122,21 @@ class Analyzer(Extractor):
             },
         }
 
+    @staticmethod
+    def _save_validated(
+        f: Path,
+        plaintext: str,
+        analysis_data: AnalysisResults,
+        results_dir: Path,
+    ) -> ValidationSummary:
+        from .validate import ValidationDict
+
+        results, match_counts = ValidationDict(plaintext, analysis_data).validate()
+
+        out_file = results_dir / f"{f.stem}_analysis.json"
+        out_file.write_bytes(json_dumps(results, indent=True))
+        return match_counts
+
     def analyze(self) -> None:
         """
         Analyzes all text files in a directory using a local Gemma:3n model
@@ -128,68 +160,87 @@ class Analyzer(Extractor):
 
         output_text: str = ""
         match_counts: dict[str, Any] = {}
-
-        console.json(global_configuration=self.config)
-
-        for f in track(
-            iterable=text_files,
-            desc="analyzing medical records",
-        ):
-            plaintext = f.read_text(encoding="utf-8")
-
-            prompt = PROMPT_TEMPLATE.format(
-                desc=self.desc,
-                date=self.date,
-                plaintext=plaintext,
-            )
-
-            text_length: int = len(plaintext)
-            total_chars: int = text_length + PROMPT_LENGTH
-
-            if math.ceil(total_chars / 4) > self.max_tokens:
-                console.error(
-                    f"Skipping analysis for {f.name}.",
-                    f"Text length ({text_length}) exceeded maximum allowed (max_tokens: {self.max_tokens}).",
-                )
-                continue
-
-            console.json("current_file_info", text_length=text_length, prompt=prompt)
-
+        pending: tuple[str, Future[ValidationSummary]] | None = None
+
+        def collect() -> None:
+            nonlocal pending
+            if pending is None:
+                return
+            stem, future = pending
+            pending = None
             try:
-
-                @timings()
-                def generate_response() -> str:
-                    response = ollama.generate(
-                        model=self.model_id,
-                        system=SYSTEM_PROMPT,
-                        format=RESPONSE_SCHEMA,
-                        prompt=prompt,
-                        options=self._options,
-                        # keep alive for 1 hour
-                        keep_alive=3600,
-                    )
-
-                    return response.response
-
-                output_text = generate_response()
-                analysis_data: AnalysisResults = json.loads(output_text)
-
-                from .validate import ValidationDict
-
-                results, match_counts[f.stem] = ValidationDict(plaintext, analysis_data).validate()
-
-                out_file = self.results_dir / f"{f.stem}_analysis.json"
-                out_file.write_text(json.dumps(results, indent=4))
-
-            except json.JSONDecodeError as e:
-                console.error(f"Error parsing JSON from LLM for {f.name}.", exception=e)
-                raise e
-
+                match_counts[stem] = future.result()
             except Exception as e:
-                console.error(exception=e)
+                console.error(f"Error validating analysis for {stem}.", exception=e)
                 raise e
 
-        console.json(match_counts=match_counts)
+        import ollama
+
+        console.json(global_configuration=self.config)
+        prompt_head = PROMPT_HEAD.format(desc=self.desc, date=self.date)
+        # first access may prompt or exit, which has to happen on the main thread
+        results_dir = self.results_dir
+
+        # ollama serves one generation at a time, so a single worker is enough to
+        # overlap validating/saving the previous document with the next request
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            try:
+                for f in track(
+                    iterable=text_files,
+                    desc="analyzing medical records",
+                    weight=lambda f: f.stat().st_size,
+                ):
+                    plaintext = f.read_text(encoding="utf-8")
+
+                    prompt = prompt_head + plaintext + PROMPT_TAIL
+
+                    text_length: int = len(plaintext)
+                    total_chars: int = text_length + PROMPT_LENGTH
+
+                    if math.ceil(total_chars / 4) > self.max_tokens:
+                        console.error(
+                            f"Skipping analysis for {f.name}.",
+                            f"Text length ({text_length}) exceeded maximum allowed (max_tokens: {self.max_tokens}).",
+                        )
+                        continue
+
+                    console.json("current_file_info", text_length=text_length, prompt=prompt)
+
+                    try:
+
+                        @timings()
+                        def generate_response() -> str:
+                            response = ollama.generate(
+                                model=self.model_id,
+                                system=SYSTEM_PROMPT,
+                                format=RESPONSE_SCHEMA,
+                                prompt=prompt,
+                                options=self._options,
+                                # keep alive for 1 hour
+                                keep_alive=3600,
+                            )
+
+                            return response.response
+
+                        output_text = generate_response()
+                        analysis_data: AnalysisResults = json_loads(output_text)
+
+                    except orjson.JSONDecodeError as e:
+                        console.error(f"Error parsing JSON from LLM for {f.name}.", exception=e)
+                        raise e
+
+                    except Exception as e:
+                        console.error(exception=e)
+                        raise e
+
+                    # surface a failed save of the previous document before queueing this one
+                    collect()
+                    pending = f.stem, pool.submit(self._save_validated, f, plaintext, analysis_data, results_dir)
+            finally:
+                try:
+                    collect()
+                finally:
+                    console.json(match_counts=match_counts)
 
     @staticmethod
     def init_analysis_args(subparsers: Subparsers) -> None:
@@ -259,6 +310,14 @@ class Analyzer(Extractor):
             help="If set to True, will print the program configuration and exit without execution.",
             type=argtype.boolstring,
         )
+        dev.add_argument(
+            "--max_workers",
+            metavar="Max Workers",
+            help="The number of processes used to extract plaintexts. Defaults to one per CPU core.",
+            widget="IntegerField",
+            gooey_options={"min": 0, "initial_value": 0},
+            type=argtype.nonnegative,
+        )
         llm_params = dev.add_argument_group(
             "LLM Parameters",
             description="Configure relevant parameters for the LLM. "
@@ -1,21 +1,83 @@
 from __future__ import annotations
-from apps.common import track, console
+from apps.common import track, console, json_dumps, json_loads
 from .typeshed import JSONDict
 
-import fitz
+import functools
+import hashlib
+import orjson
+import os
 import typing
 
 if typing.TYPE_CHECKING:
     from .typeshed import *
 
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
 Metadata = typing.NamedTuple("Metadata", [("path", Path), ("json", JSONDict)])
 
+FINGERPRINTS = typing.final(".fingerprints.json")
+
+
+@functools.cache
+def _tessdata() -> str:
+    import fitz
+
+    # without TESSDATA_PREFIX, pymupdf shells out to tesseract to locate this on every call
+    return fitz.get_tessdata()
+
+
+def _page_text(page: Page) -> str:
+    # partial ocr only adds text for images and illegible glyphs, so pages without
+    # either already have everything in their digital text layer. get_image_info
+    # also sees inline images, which get_images (xobjects only) would miss
+    if not page.get_image_info():
+        text = page.get_text(flags=0)
+        if chr(0xFFFD) not in text:
+            return text
+
+    import fitz
+
+    return fitz.utils.get_textpage_ocr(page, tessdata=_tessdata()).extractText()
+
+
+def _fingerprint(path: Path) -> str:
+    with path.open("rb") as f:
+        return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+
+def _ocr_to_file(src: Path, dst: Path, known: str | None = None) -> str:
+    # always hash: a replacement pdf can keep the same size and mtime (cp -p, unzip)
+    digest = _fingerprint(src)
+    # byte-identical input, so the plaintext from the last run is still valid
+    if digest == known and dst.exists():
+        return digest
+
+    import fitz
+
+    # pages are written as they are read so the whole document is never held in memory,
+    # into a sibling that only replaces dst once every page made it
+    part = dst.with_suffix(".txt.part")
+    try:
+        with (
+            fitz.open(src) as doc,
+            part.open("w", encoding="utf-8", newline="", buffering=1 << 20) as out,
+        ):
+            for i, page in enumerate(doc):
+                if i:
+                    out.write(chr(12))
+                out.write(_page_text(page))
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+    os.replace(part, dst)
+    return digest
+
 
 class Extractor:
     path: Path
+    max_workers: int | None = None
 
     _skip_extract: bool = False
     _total_files: int
@@ -24,6 +86,16 @@ class Extractor:
         self._total_files: int = total
         track.GLOBAL_TOTAL = total
 
+    @staticmethod
+    def _list_files(directory: Path, *suffixes: str) -> list[Path]:
+        exts = frozenset(suffixes)
+        with os.scandir(directory) as entries:
+            return [
+                Path(entry.path)
+                for entry in entries
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in exts
+            ]
+
     def _rebase_file(
         self,
         file: str | Path,
@@ -57,7 +129,7 @@ class Extractor:
     def _safe_get_directory(self, dirname: str, *, override: Path | None) -> Path:
         path = (override or self.path) / dirname
         if not path.exists():
-            path.mkdir()
+            path.mkdir(parents=True)
         elif any(path.iterdir()):
             if not console.confirm(f"Overwrite existing files at '{path}'?"):
                 match dirname:
@@ -69,29 +141,16 @@ class Extractor:
 
     custom_text_dir: Path | None = None
 
-    @property
+    @functools.cached_property
     def text_dir(self) -> Path:
         return self._safe_get_directory("plaintext", override=self.custom_text_dir)
 
     custom_results_dir: Path | None = None
 
-    @property
+    @functools.cached_property
     def results_dir(self) -> Path:
         return self._safe_get_directory("analysis", override=self.custom_results_dir)
 
-    def _process_textpage_chunk(
-        self,
-        textpages: Iter[TextPage],
-    ) -> str:
-        return chr(12).join(
-            textpage.extractText()
-            for textpage in track(
-                iterable=textpages,
-                desc="extracting plaintext",
-                total=self._total_files,
-            )
-        )
-
     def _extract_text(self) -> list[Path]:
         """
         Extracts text from all PDF files in a given directory and saves it to
@@ -107,31 +166,44 @@ class Extractor:
         text_dir = self.text_dir
 
         if self._skip_extract:
-            text_files = [f for f in text_dir.iterdir() if f.suffix == ".txt" and f.is_file()]
+            text_files = self._list_files(text_dir, ".txt")
             self.set_total_files(len(text_files))
             return text_files
 
-        input_files = [f for f in self.path.iterdir() if f.suffix == ".pdf" and f.is_file()]
+        input_files = self._list_files(self.path, ".pdf")
         self.set_total_files(len(input_files))
 
-        chunk_generators = [
-            (fitz.utils.get_textpage_ocr(p) for p in pages)
-            for pages in track(
-                iterable=(fitz.open(f).pages() for f in input_files),
-                desc="running optical character recognition",
-            )
-        ]
-
         text_files = [text_dir / f"{f.stem}.txt" for f in input_files]
 
-        for f, text in track(
-            iterable=zip(
-                text_files,
-                (self._process_textpage_chunk(c) for c in chunk_generators),
-                strict=True,
-            ),
-            desc="extracting plaintexts",
-        ):
-            f.write_text(text, encoding="utf-8")
+        # the extension match is case-insensitive, so scan.pdf and scan.PDF would share scan.txt
+        seen: dict[Path, Path] = {}
+        clashes = [(seen[t], f) for f, t in zip(input_files, text_files) if seen.setdefault(t, f) is not f]
+        if clashes:
+            error = FileExistsError(
+                "PDF files would overwrite each other's plaintext, rename one of each pair: "
+                + "; ".join(f"{a.name} and {b.name}" for a, b in clashes)
+            )
+            console.error(exception=error)
+            raise error
+
+        cache_file = text_dir / FINGERPRINTS
+        try:
+            cache: dict[str, str] = json_loads(cache_file.read_bytes())
+        except (FileNotFoundError, orjson.JSONDecodeError):
+            cache = {}
+        known = [cache.get(f.name) for f in input_files]
+
+        # ocr is cpu-bound and holds the gil, so each document gets its own process
+        with ProcessPoolExecutor(max_workers=self.max_workers or None) as pool:
+            digests = list(
+                track(
+                    iterable=pool.map(_ocr_to_file, input_files, text_files, known),
+                    desc="extracting plaintexts",
+                    total=len(input_files),
+                )
+            )
 
+        cache_file.write_bytes(
+            json_dumps({f.name: d for f, d in zip(input_files, digests)})
+        )
         return text_files
@@ -9,7 +9,7 @@ class Medscan(Namespace, Preprocessor, Analyzer):
     command: str
 
     def invoke(self) -> None:
-        console.FILE.write_text("")
+        console.reset()
         func = self._debug if self.debug else getattr(self, self.command, None)
         if not callable(func):
             raise TypeError("Invalid command.")
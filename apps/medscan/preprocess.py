@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from apps.common import DATA_DIR, timings, console, argtype
 
-import fitz
+import functools
 import typing
 
 if typing.TYPE_CHECKING:
@@ -29,34 +29,41 @@ class Preprocessor:
     def _split_generator(self) -> Generator[int]:
         return (n for n in self.split_indices or [])
 
+    @functools.cached_property
+    def _out_prefix(self) -> str:
+        return str((self.out_dir or self.file_in.parent) / self.file_in.stem)
+
     def _get_path(self, suffix: str = "") -> Path:
         suffix_with_ext = suffix if ".pdf" in suffix else f"{suffix}.pdf"
-        return (self.out_dir or self.file_in.parent) / f"{self.file_in.stem}{suffix_with_ext}"
+        return Path(self._out_prefix + suffix_with_ext)
 
     def _clone_doc(
         self,
+        src: Document,
         from_page: int,
         to_page: int,
         start_at: int = -1,
         suffix: str = "",
     ) -> None:
-        src = fitz.open(self.file_in)
-        out = fitz.open()
-        out.insert_pdf(src, from_page=from_page, to_page=to_page, start_at=start_at)
-        out.save(self._get_path(suffix))
-        src.close()
+        import fitz
+
+        with fitz.open() as out:
+            out.insert_pdf(src, from_page=from_page, to_page=to_page, start_at=start_at)
+            out.save(self._get_path(suffix))
 
-    def _trim_doc(self) -> None:
+    def _trim_doc(self, src: Document) -> None:
         self._clone_doc(
+            src,
             from_page=self.trim_start - 1,
             to_page=self.trim_end,
             suffix="_trim",
         )
 
-    def _split_doc(self) -> None:
+    def _split_doc(self, src: Document) -> None:
         prev = getattr(self, "trim_start", 1) - 1
         for curr in self._split_generator():
             self._clone_doc(
+                src,
                 from_page=prev,
                 to_page=curr - 1,
                 suffix=f"_split_{prev + 1}-{curr}",
@@ -72,10 +79,14 @@ class Preprocessor:
             console.log("Nothing to preprocess.", "Exiting...")
             return
 
-        if self.split_indices:
-            self._split_doc()
-        if should_trim:
-            self._trim_doc()
+        import fitz
+
+        # parse the source once and share it across every split and trim
+        with fitz.open(self.file_in) as src:
+            if self.split_indices:
+                self._split_doc(src)
+            if should_trim:
+                self._trim_doc(src)
 
         if not self.keep_original:
             self.file_in.unlink()
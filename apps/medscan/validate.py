@@ -1,13 +1,25 @@
 from __future__ import annotations
 
+import functools
 import re
+import sys
 import typing as ty
 from apps.common import timings
+from .typeshed import ValidatedResult, ValidationSubject
 
 if ty.TYPE_CHECKING:
     from .typeshed import *
 
 
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@functools.lru_cache(maxsize=4096)
+def _tokenize(text: str) -> tuple[str, ...]:
+    # the same injuries and treatments recur across documents in a run
+    return tuple(_TOKEN_RE.findall(text.lower()))
+
+
 class ValidationDict(dict[ValidationSubject, ValidatedResult]):
     """Runtime validation container.
 
@@ -17,6 +29,8 @@ class ValidationDict(dict[ValidationSubject, ValidatedResult]):
     that favors consecutive n-gram matches.
     """
 
+    __slots__ = ("match_counts", "plaintext", "base_results", "_words", "_ngrams")
+
     _subjects = ty.final(("injuries", "treatments"))
     _verdicts = ty.final(("verified", "unverified"))
 
@@ -24,6 +38,8 @@ class ValidationDict(dict[ValidationSubject, ValidatedResult]):
         # counts are per-item (not per-token)
         self.match_counts = {s: {v: 0 for v in self._verdicts} for s in self._subjects}
         self.plaintext = plaintext
+        self._words = _TOKEN_RE.findall(plaintext.lower())
+        self._ngrams: dict[int, set[tuple[str, ...]]] = {}
         self.base_results = analysis_results
         super().__init__()
         for s in self._subjects:
@@ -41,6 +57,14 @@ class ValidationDict(dict[ValidationSubject, ValidatedResult]):
         self[subj][verdict][item] = confidence, matches
         self.match_counts[subj][verdict] += 1
 
+    def _doc_ngrams(self, length: int) -> set[tuple[str, ...]]:
+        """Return every run of `length` consecutive plaintext tokens, built on first use."""
+        ngrams = self._ngrams.get(length)
+        if ngrams is None:
+            words = self._words
+            ngrams = self._ngrams[length] = set(zip(*(words[k:] for k in range(length))))
+        return ngrams
+
     def _score_item(self, item_str: str, bonus_factor: float = 0.5) -> tuple[float, list[str]]:
         """Compute a confidence score [0,1] and return the list of matched phrases.
 
@@ -56,26 +80,27 @@ class ValidationDict(dict[ValidationSubject, ValidatedResult]):
           token length so the returned confidence is in [0,1].
         """
 
-        token_re = re.compile(r"\w+", re.UNICODE)
-        words = token_re.findall(item_str.lower())
+        words = _tokenize(item_str)
         if not words:
             return 0.0, []
 
-        plaintext = self.plaintext.lower()
-
         i = 0
         runs: list[int] = []
         matched_phrases: list[str] = []
         n = len(words)
+        unigrams = self._doc_ngrams(1)
 
         while i < n:
             found_len = 0
+            # no n-gram can run past a word the plaintext never contains
+            end = i
+            while end < n and words[end : end + 1] in unigrams:
+                end += 1
             # try longest n-gram first (greedy)
-            for L in range(n - i, 0, -1):
-                phrase = " ".join(words[i : i + L])
-                if phrase in plaintext:
+            for L in range(end - i, 0, -1):
+                if words[i : i + L] in self._doc_ngrams(L):
                     found_len = L
-                    matched_phrases.append(phrase)
+                    matched_phrases.append(" ".join(words[i : i + L]))
                     break
 
             if found_len > 0:
@@ -107,7 +132,7 @@ class ValidationDict(dict[ValidationSubject, ValidatedResult]):
 
         for subj in self._subjects:
             for item in self.base_results.get(subj, ()):
-                item_str = str(item)
+                item_str = sys.intern(str(item))
                 confidence, matches = self._score_item(item_str)
                 verdict = "verified" if confidence >= threshold and matches else "unverified"
                 self._set(item_str, matches, confidence, subj, verdict)
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
-import wx
+import multiprocessing
 from apps import Medscan
 from apps.goo import gooify, gooparse
 from typing import final
 
-app = wx.App()
 description = final("Preprocess and analyze medical record PDF files using local tools and LLMs.")
 
 
@@ -22,4 +21,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()